@@ -14,15 +14,23 @@
 # under the License.
 
 """Base test cases for all neutron tests.
+
+Modules only needed by some of the helpers below (eventlet, RPC, agents, the
+plugin manager) are imported where they are used, to keep importing this
+module cheap.
 """
 
+import collections
 import contextlib
+import functools
 import gc
 import os
 import os.path
+import shutil
+import string
+import tempfile
 import weakref
 
-import eventlet.timeout
 import fixtures
 import mock
 from oslo_concurrency.fixture import lockutils
@@ -35,16 +43,11 @@ import six
 import testtools
 
 from neutron._i18n import _
-from neutron.agent.linux import external_process
-from neutron.api.rpc.callbacks.consumer import registry as rpc_consumer_reg
 from neutron.callbacks import manager as registry_manager
 from neutron.callbacks import registry
 from neutron.common import config
 from neutron.common import constants
-from neutron.common import rpc as n_rpc
 from neutron.common import utils
-from neutron.db import agentschedulers_db
-from neutron import manager
 from neutron import policy
 from neutron.tests import fake_notifier
 from neutron.tests import post_mortem_debug
@@ -62,10 +65,29 @@ def etcdir(*p):
     return os.path.join(ETCDIR, *p)
 
 
+NEUTRON_CONF = etcdir('neutron.conf')
+
+
 def fake_use_fatal_exceptions(*args):
     return True
 
 
+_initialized = False
+_post_mortem_handler = None
+
+
+def _init_once():
+    """Perform test setup that is invariant for the whole test process."""
+    global _initialized, _post_mortem_handler
+    if _initialized:
+        return
+    debugger = os.environ.get('OS_POST_MORTEM_DEBUGGER')
+    if debugger:
+        _post_mortem_handler = post_mortem_debug.get_exception_handler(
+            debugger)
+    _initialized = True
+
+
 def get_related_rand_names(prefixes, max_length=None):
     """Returns a list of the prefixes with the same random characters appended
 
@@ -92,6 +114,9 @@ def get_rand_name(max_length=None, prefix='test'):
     hexadecimal, will be added. In case len(prefix) <= len(max_length),
     ValueError will be raised to indicate the problem.
     """
+    if not max_length:
+        # Fast path for the common case, see get_related_rand_names()
+        return prefix + utils.get_random_string(8)
     return get_related_rand_names([prefix], max_length)[0]
 
 
@@ -105,11 +130,46 @@ def get_related_rand_device_names(prefixes):
                                   max_length=constants.DEVICE_NAME_MAX_LEN)
 
 
+def _start_patchers(owner, patchers):
+    """Start reusable patchers for the lifetime of a test or fixture.
+
+    The patchers are stopped in reverse order by a single cleanup
+    registered on owner.
+
+    :returns: a list with the replacement object of each patcher
+    """
+    started = []
+
+    def stop_patchers():
+        for patcher in reversed(started):
+            patcher.stop()
+
+    owner.addCleanup(stop_patchers)
+    replacements = []
+    for patcher in patchers:
+        replacements.append(patcher.start())
+        started.append(patcher)
+    return replacements
+
+
 def bool_from_env(key, strict=False, default=False):
     value = os.environ.get(key)
     return strutils.bool_from_string(value, strict=strict, default=default)
 
 
+def _reset_policy_if_modified(enforcer, rules, rules_copy):
+    """Reset the policy engine if it differs from the given snapshot."""
+    if (policy._ENFORCER is not enforcer or enforcer.rules is not rules or
+            rules != rules_copy):
+        policy.reset()
+
+
+# Perform a check for deallocation only if explicitly configured to do so
+# since calling gc.collect() after every test increases test suite execution
+# time by ~50%.
+CHECK_PLUGIN_DEALLOCATION = bool_from_env('OS_CHECK_PLUGIN_DEALLOCATION')
+
+
 def setup_test_logging(config_opts, log_dir, log_file_path_template):
     # Have each test log into its own log file
     config_opts.set_override('debug', True)
@@ -121,12 +181,18 @@ def setup_test_logging(config_opts, log_dir, log_file_path_template):
     config.setup_logging()
 
 
+# Replaces ' ' with '-' and parentheses with '_' in a single pass. Text
+# strings need an ordinal mapping, python 2 byte strings a 256 byte table.
+_LOG_PATH_TRANS = {ord(u' '): u'-', ord(u'('): u'_', ord(u')'): u'_'}
+if six.PY2:
+    _LOG_PATH_BYTES_TRANS = string.maketrans(' ()', '-__')
+
+
 def sanitize_log_path(path):
     # Sanitize the string so that its log path is shell friendly
-    replace_map = {' ': '-', '(': '_', ')': '_'}
-    for s, r in six.iteritems(replace_map):
-        path = path.replace(s, r)
-    return path
+    if six.PY2 and isinstance(path, str):
+        return path.translate(_LOG_PATH_BYTES_TRANS)
+    return path.translate(_LOG_PATH_TRANS)
 
 
 class AttributeDict(dict):
@@ -135,11 +201,14 @@ class AttributeDict(dict):
     Provide attribute access (dict.key) to dictionary values.
     """
 
+    # Translated once, attribute misses are frequent (hasattr, pickling)
+    _unknown_attribute_msg = _("Unknown attribute '%s'.")
+
     def __getattr__(self, name):
         """Allow attribute access for all keys in the dict."""
         if name in self:
             return self[name]
-        raise AttributeError(_("Unknown attribute '%s'.") % name)
+        raise AttributeError(self._unknown_attribute_msg % name)
 
 
 class DietTestCase(base.BaseTestCase):
@@ -150,6 +219,15 @@ class DietTestCase(base.BaseTestCase):
     only functionality that is common across all tests.
     """
 
+    # Resolved once per test class from OS_POST_MORTEM_DEBUGGER
+    post_mortem_handler = None
+
+    @classmethod
+    def setUpClass(cls):
+        super(DietTestCase, cls).setUpClass()
+        _init_once()
+        cls.post_mortem_handler = _post_mortem_handler
+
     def setUp(self):
         super(DietTestCase, self).setUp()
 
@@ -159,10 +237,8 @@ class DietTestCase(base.BaseTestCase):
         config.set_db_defaults()
 
         # Configure this first to ensure pm debugging support for setUp()
-        debugger = os.environ.get('OS_POST_MORTEM_DEBUGGER')
-        if debugger:
-            self.addOnException(post_mortem_debug.get_exception_handler(
-                debugger))
+        if self.post_mortem_handler:
+            self.addOnException(self.post_mortem_handler)
 
         # Make sure we see all relevant deprecation warnings when running tests
         self.useFixture(tools.WarningsFixture())
@@ -175,7 +251,9 @@ class DietTestCase(base.BaseTestCase):
         # six before removing the cleanup callback from here.
         self.addCleanup(mock.patch.stopall)
 
-        self.addOnException(self.check_for_systemexit)
+        # check_for_systemexit only ever raises SystemExit, which safe_handler
+        # does not catch, so register it without the wrapping
+        super(DietTestCase, self).addOnException(self.check_for_systemexit)
         self.orig_pid = os.getpid()
 
         tools.reset_random_seed()
@@ -203,6 +281,8 @@ class DietTestCase(base.BaseTestCase):
 
     @contextlib.contextmanager
     def assert_max_execution_time(self, max_execution_time=5):
+        import eventlet.timeout
+
         with eventlet.timeout.Timeout(max_execution_time, False):
             yield
             return
@@ -214,11 +294,14 @@ class DietTestCase(base.BaseTestCase):
         self.assertEqual(expect_val, actual_val)
 
     def sort_dict_lists(self, dic):
-        for key, value in six.iteritems(dic):
-            if isinstance(value, list):
-                dic[key] = sorted(value)
-            elif isinstance(value, dict):
-                dic[key] = self.sort_dict_lists(value)
+        dicts = collections.deque([dic])
+        while dicts:
+            current = dicts.pop()
+            for key, value in current.items():
+                if isinstance(value, list):
+                    current[key] = sorted(value)
+                elif isinstance(value, dict):
+                    dicts.append(value)
         return dic
 
     def assertDictSupersetOf(self, expected_subset, actual_superset):
@@ -246,6 +329,8 @@ class ProcessMonitorFixture(fixtures.Fixture):
     """Test fixture to capture and cleanup any spawn process monitor."""
 
     def _setUp(self):
+        from neutron.agent.linux import external_process
+
         self.old_callable = (
             external_process.ProcessMonitor._spawn_checking_thread)
         p = mock.patch("neutron.agent.linux.external_process.ProcessMonitor."
@@ -266,13 +351,17 @@ class ProcessMonitorFixture(fixtures.Fixture):
 
 class BaseTestCase(DietTestCase):
 
+    # Tests that create agents or process monitors must set this so that
+    # any spawned process monitor is captured and stopped during cleanup.
+    _needs_process_monitor = False
+
     @staticmethod
     def config_parse(conf=None, args=None):
         """Create the default configurations."""
         # neutron.conf includes rpc_backend which needs to be cleaned up
         if args is None:
             args = []
-        args += ['--config-file', etcdir('neutron.conf')]
+        args += ['--config-file', NEUTRON_CONF]
         if conf is None:
             config.init(args=args)
         else:
@@ -286,7 +375,8 @@ class BaseTestCase(DietTestCase):
         cfg.CONF.set_override('state_path', self.get_default_temp_dir().path)
 
         self.addCleanup(CONF.reset)
-        self.useFixture(ProcessMonitorFixture())
+        if self._needs_process_monitor:
+            self.useFixture(ProcessMonitorFixture())
 
         self.useFixture(fixtures.MonkeyPatch(
             'neutron.common.exceptions.NeutronException.use_fatal_exceptions',
@@ -300,9 +390,12 @@ class BaseTestCase(DietTestCase):
         self.setup_config()
         self.setup_test_registry_instance()
 
+        # The policy enforcer is kept across tests and only reset when a
+        # test modified or replaced it. init() builds a new enforcer and
+        # loads the policy file only when the previous test reset it.
         policy.init()
-        self.addCleanup(policy.reset)
-        self.addCleanup(rpc_consumer_reg.clear)
+        self.addCleanup(_reset_policy_if_modified, policy._ENFORCER,
+                        policy._ENFORCER.rules, dict(policy._ENFORCER.rules))
 
     def get_new_temp_dir(self):
         """Create a new temporary directory.
@@ -311,15 +404,28 @@ class BaseTestCase(DietTestCase):
         """
         return self.useFixture(fixtures.TempDir())
 
+    def get_new_temp_dir_fast(self):
+        """Create a new temporary directory without the TempDir fixture.
+
+        The directory is removed during test cleanup.
+
+        :returns AttributeDict with the same path attribute and join method
+                 as fixtures.TempDir
+        """
+        path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, path, ignore_errors=True)
+        return AttributeDict(path=path,
+                             join=functools.partial(os.path.join, path))
+
     def get_default_temp_dir(self):
         """Create a default temporary directory.
 
         Returns the same directory during the whole test case.
 
-        :returns fixtures.TempDir
+        :returns AttributeDict as returned by get_new_temp_dir_fast
         """
         if not hasattr(self, '_temp_dir'):
-            self._temp_dir = self.get_new_temp_dir()
+            self._temp_dir = self.get_new_temp_dir_fast()
         return self._temp_dir
 
     def get_temp_file_path(self, filename, root=None):
@@ -334,17 +440,21 @@ class BaseTestCase(DietTestCase):
         :param filename: filename
         :type filename: string
         :param root: temporary directory to create a new file in
-        :type root: fixtures.TempDir
+        :type root: fixtures.TempDir or the result of get_new_temp_dir_fast
         :returns absolute file path string
         """
         root = root or self.get_default_temp_dir()
         return root.join(filename)
 
     def setup_rpc_mocks(self):
+        from neutron.api.rpc.callbacks.consumer import registry as consumer_reg
+        from neutron.common import rpc as n_rpc
+
         # don't actually start RPC listeners when testing
         mock.patch(
             'neutron.common.rpc.Connection.consume_in_threads',
             return_value=[]).start()
+        self.addCleanup(consumer_reg.clear)
 
         self.useFixture(fixtures.MonkeyPatch(
             'oslo_messaging.Notifier', fake_notifier.FakeNotifier))
@@ -384,7 +494,7 @@ class BaseTestCase(DietTestCase):
         test by the fixtures cleanup process.
         """
         group = kw.pop('group', None)
-        for k, v in six.iteritems(kw):
+        for k, v in kw.items():
             CONF.set_override(k, v, group)
 
     def setup_coreplugin(self, core_plugin=None):
@@ -405,21 +515,26 @@ class PluginFixture(fixtures.Fixture):
     def __init__(self, core_plugin=None):
         super(PluginFixture, self).__init__()
         self.core_plugin = core_plugin
-
-    def _setUp(self):
+        # Patchers hold the original attribute while started, so each
+        # fixture needs its own to allow several to be in use at once.
         # Do not load default service plugins in the testing framework
         # as all the mocking involved can cause havoc.
         self.default_svc_plugins_p = mock.patch(
             'neutron.manager.NeutronManager._get_default_service_plugins')
-        self.patched_default_svc_plugins = self.default_svc_plugins_p.start()
         self.dhcp_periodic_p = mock.patch(
             'neutron.db.agentschedulers_db.DhcpAgentSchedulerDbMixin.'
             'start_periodic_dhcp_agent_status_check')
-        self.patched_dhcp_periodic = self.dhcp_periodic_p.start()
         self.agent_health_check_p = mock.patch(
             'neutron.db.agentschedulers_db.DhcpAgentSchedulerDbMixin.'
             'add_agent_status_check')
-        self.agent_health_check = self.agent_health_check_p.start()
+
+    def _setUp(self):
+        (self.patched_default_svc_plugins,
+         self.patched_dhcp_periodic,
+         self.agent_health_check) = _start_patchers(
+            self, [self.default_svc_plugins_p,
+                   self.dhcp_periodic_p,
+                   self.agent_health_check_p])
         # Plugin cleanup should be triggered last so that
         # test-specific cleanup has a chance to release references.
         self.addCleanup(self.cleanup_core_plugin)
@@ -428,6 +543,9 @@ class PluginFixture(fixtures.Fixture):
 
     def cleanup_core_plugin(self):
         """Ensure that the core plugin is deallocated."""
+        from neutron.db import agentschedulers_db
+        from neutron import manager
+
         nm = manager.NeutronManager
         if not nm.has_instance():
             return
@@ -435,18 +553,18 @@ class PluginFixture(fixtures.Fixture):
         # TODO(marun) Fix plugins that do not properly initialize notifiers
         agentschedulers_db.AgentSchedulerDbMixin.agent_notifiers = {}
 
-        # Perform a check for deallocation only if explicitly
-        # configured to do so since calling gc.collect() after every
-        # test increases test suite execution time by ~50%.
-        check_plugin_deallocation = (
-            bool_from_env('OS_CHECK_PLUGIN_DEALLOCATION'))
-        if check_plugin_deallocation:
+        if CHECK_PLUGIN_DEALLOCATION:
             plugin = weakref.ref(nm._instance.plugin)
 
         nm.clear_instance()
 
-        if check_plugin_deallocation:
-            gc.collect()
+        if CHECK_PLUGIN_DEALLOCATION:
+            # Most plugins are freed by reference counting or by collecting
+            # the youngest generation, only scan the whole heap if needed.
+            for generation in (0, 2):
+                if plugin() is None:
+                    break
+                gc.collect(generation)
 
             # TODO(marun) Ensure that mocks are deallocated?
             if plugin() and not isinstance(plugin(), mock.Base):
@@ -45,6 +45,8 @@ def get_ovs_bridge(br_name):
 
 
 class L3AgentTestFramework(base.BaseSudoTestCase):
+    _needs_process_monitor = True
+
     def setUp(self):
         super(L3AgentTestFramework, self).setUp()
         self.mock_plugin_api = mock.patch(
@@ -27,6 +27,8 @@ _uuid = uuidutils.generate_uuid
 
 class NamespaceManagerTestFramework(base.BaseSudoTestCase):
 
+    _needs_process_monitor = True
+
     def setUp(self):
         super(NamespaceManagerTestFramework, self).setUp()
         self.agent_conf = mock.MagicMock()
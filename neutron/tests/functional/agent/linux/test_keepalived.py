@@ -27,6 +27,8 @@ from neutron.tests.unit.agent.linux import test_keepalived
 class KeepalivedManagerTestCase(base.BaseTestCase,
                                 test_keepalived.KeepalivedConfBaseMixin):
 
+    _needs_process_monitor = True
+
     def setUp(self):
         super(KeepalivedManagerTestCase, self).setUp()
         cfg.CONF.set_override('check_child_processes_interval', 1, 'AGENT')
@@ -29,6 +29,8 @@ SERVICE_NAME = "service"
 
 class BaseTestProcessMonitor(base.BaseTestCase):
 
+    _needs_process_monitor = True
+
     def setUp(self):
         super(BaseTestProcessMonitor, self).setUp()
         cfg.CONF.set_override('check_child_processes_interval', 1, 'AGENT')
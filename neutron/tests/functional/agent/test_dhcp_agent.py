@@ -40,6 +40,8 @@ from neutron.tests.functional import base
 
 class DHCPAgentOVSTestFramework(base.BaseSudoTestCase):
 
+    _needs_process_monitor = True
+
     _DHCP_PORT_MAC_ADDRESS = netaddr.EUI("24:77:03:7d:00:4c")
     _DHCP_PORT_MAC_ADDRESS.dialect = netaddr.mac_unix
     _TENANT_PORT_MAC_ADDRESS = netaddr.EUI("24:77:03:7d:00:3a")
@@ -27,6 +27,8 @@ TEST_INTERFACE_DRIVER = 'neutron.agent.linux.interface.OVSInterfaceDriver'
 
 
 class NetnsCleanupTest(base.BaseSudoTestCase):
+    _needs_process_monitor = True
+
     def setUp(self):
         super(NetnsCleanupTest, self).setUp()
 
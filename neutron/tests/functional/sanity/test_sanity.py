@@ -53,6 +53,8 @@ class SanityTestCaseRoot(functional_base.BaseSudoTestCase):
     where someone modifies the API without updating the check script.
     """
 
+    _needs_process_monitor = True
+
     def test_ovs_vxlan_support_runs(self):
         checks.ovs_vxlan_supported()
 
@@ -360,6 +360,19 @@ class BaseNetworkTest(test.BaseTestCase):
             cls.address_scopes.append(body['address_scope'])
         return body['address_scope']
 
+    @classmethod
+    def create_address_scopes(cls, names, is_admin=False, **kwargs):
+        """Create several address scopes with a single bulk request."""
+        address_scope_list = [dict(kwargs, name=name) for name in names]
+        if is_admin:
+            body = cls.admin_client.create_bulk_address_scope(
+                address_scope_list)
+            cls.admin_address_scopes.extend(body['address_scopes'])
+        else:
+            body = cls.client.create_bulk_address_scope(address_scope_list)
+            cls.address_scopes.extend(body['address_scopes'])
+        return body['address_scopes']
+
     @classmethod
     def create_subnetpool(cls, name, is_admin=False, **kwargs):
         if is_admin:
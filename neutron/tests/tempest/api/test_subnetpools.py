@@ -13,6 +13,7 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import netaddr
 from tempest.lib.common.utils import data_utils
 from tempest import test
 
@@ -22,36 +23,38 @@ SUBNETPOOL_NAME = 'smoke-subnetpool'
 SUBNET_NAME = 'smoke-subnet'
 
 
+def _rand_names(count, prefix=SUBNETPOOL_NAME):
+    """Return count distinct names sharing a single random suffix."""
+    name = data_utils.rand_name(prefix)
+    return ['%s-%d' % (name, i) for i in range(count)]
+
+
 class SubnetPoolsTestBase(base.BaseAdminNetworkTest):
 
     @classmethod
     def resource_setup(cls):
         super(SubnetPoolsTestBase, cls).resource_setup()
-        min_prefixlen = '29'
-        prefixes = [u'10.11.12.0/24']
+        if cls._ip_version == 4:
+            min_prefixlen = '29'
+            prefixes = [u'10.11.12.0/24']
+        else:
+            min_prefixlen = '64'
+            prefixes = [u'2001:db8:3::/48']
         cls._subnetpool_data = {'prefixes': prefixes,
                                 'min_prefixlen': min_prefixlen}
 
-    def _create_subnetpool(self, is_admin=False, **kwargs):
+    @classmethod
+    def _create_subnetpool(cls, is_admin=False, **kwargs):
+        kwargs = dict(cls._subnetpool_data, **kwargs)
         if 'name' not in kwargs:
-            name = data_utils.rand_name(SUBNETPOOL_NAME)
-        else:
-            name = kwargs.pop('name')
-
-        if 'prefixes' not in kwargs:
-            kwargs['prefixes'] = self._subnetpool_data['prefixes']
-
-        if 'min_prefixlen' not in kwargs:
-            kwargs['min_prefixlen'] = self._subnetpool_data['min_prefixlen']
-
-        return self.create_subnetpool(name=name, is_admin=is_admin, **kwargs)
+            kwargs['name'] = data_utils.rand_name(SUBNETPOOL_NAME)
+        return cls.create_subnetpool(is_admin=is_admin, **kwargs)
 
 
 class SubnetPoolsTest(SubnetPoolsTestBase):
 
     min_prefixlen = '28'
     max_prefixlen = '31'
-    _ip_version = 4
     subnet_cidr = u'10.11.12.0/31'
     new_prefix = u'10.11.15.0/24'
     larger_prefix = u'10.11.0.0/16'
@@ -72,6 +75,15 @@ class SubnetPoolsTest(SubnetPoolsTestBase):
 
     """
 
+    @classmethod
+    def resource_setup(cls):
+        super(SubnetPoolsTest, cls).resource_setup()
+        # Subnets allocated from the test pools are created on this network
+        # and deleted at the end of each test, so their cidrs never overlap.
+        cls.network = cls.create_network()
+        # Only read by the tests, never updated.
+        cls.subnetpool = cls._create_subnetpool()
+
     def _new_subnetpool_attributes(self):
         new_name = data_utils.rand_name(SUBNETPOOL_NAME)
         return {'name': new_name, 'min_prefixlen': self.min_prefixlen,
@@ -93,15 +105,14 @@ class SubnetPoolsTest(SubnetPoolsTestBase):
     @test.attr(type='smoke')
     @test.idempotent_id('6e1781ec-b45b-4042-aebe-f485c022996e')
     def test_create_list_subnetpool(self):
-        created_subnetpool = self._create_subnetpool()
-        body = self.client.list_subnetpools()
-        subnetpools = body['subnetpools']
-        self.assertIn(created_subnetpool['id'],
-                      [sp['id'] for sp in subnetpools],
-                      "Created subnetpool id should be in the list")
-        self.assertIn(created_subnetpool['name'],
-                      [sp['name'] for sp in subnetpools],
-                      "Created subnetpool name should be in the list")
+        created_subnetpool = self.subnetpool
+        body = self.client.list_subnetpools(name=created_subnetpool['name'],
+                                            fields=['id', 'name'])
+        subnetpools = [(sp['id'], sp['name']) for sp in body['subnetpools']]
+        self.assertEqual([(created_subnetpool['id'],
+                           created_subnetpool['name'])],
+                         subnetpools,
+                         "Created subnetpool should be the only one listed")
 
     @test.attr(type='smoke')
     @test.idempotent_id('c72c1c0c-2193-4aca-ddd4-b1442640bbbb')
@@ -110,20 +121,13 @@ class SubnetPoolsTest(SubnetPoolsTestBase):
     def test_create_update_subnetpool_description(self):
         body = self._create_subnetpool(description='d1')
         self.assertEqual('d1', body['description'])
-        sub_id = body['id']
-        body = filter(lambda x: x['id'] == sub_id,
-                      self.client.list_subnetpools()['subnetpools'])[0]
-        self.assertEqual('d1', body['description'])
-        body = self.client.update_subnetpool(sub_id, description='d2')
+        body = self.client.update_subnetpool(body['id'], description='d2')
         self.assertEqual('d2', body['subnetpool']['description'])
-        body = filter(lambda x: x['id'] == sub_id,
-                      self.client.list_subnetpools()['subnetpools'])[0]
-        self.assertEqual('d2', body['description'])
 
     @test.attr(type='smoke')
     @test.idempotent_id('741d08c2-1e3f-42be-99c7-0ea93c5b728c')
     def test_get_subnetpool(self):
-        created_subnetpool = self._create_subnetpool()
+        created_subnetpool = self.subnetpool
         prefixlen = self._subnetpool_data['min_prefixlen']
         body = self.client.show_subnetpool(created_subnetpool['id'])
         subnetpool = body['subnetpool']
@@ -137,12 +141,9 @@ class SubnetPoolsTest(SubnetPoolsTestBase):
     @test.idempotent_id('764f1b93-1c4a-4513-9e7b-6c2fc5e9270c')
     def test_tenant_update_subnetpool(self):
         created_subnetpool = self._create_subnetpool()
-        pool_id = created_subnetpool['id']
         subnetpool_data = self._new_subnetpool_attributes()
-        self.client.update_subnetpool(created_subnetpool['id'],
-                                      **subnetpool_data)
-
-        body = self.client.show_subnetpool(pool_id)
+        body = self.client.update_subnetpool(created_subnetpool['id'],
+                                             **subnetpool_data)
         subnetpool = body['subnetpool']
         self._check_equality_updated_subnetpool(subnetpool_data,
                                                 subnetpool)
@@ -158,8 +159,7 @@ class SubnetPoolsTest(SubnetPoolsTestBase):
         new_prefixes = old_prefixes[:]
         new_prefixes.append(self.new_prefix)
         subnetpool_data = {'prefixes': new_prefixes}
-        self.client.update_subnetpool(pool_id, **subnetpool_data)
-        body = self.client.show_subnetpool(pool_id)
+        body = self.client.update_subnetpool(pool_id, **subnetpool_data)
         prefixes = body['subnetpool']['prefixes']
         self.assertIn(self.new_prefix, prefixes)
         self.assertIn(old_prefixes[0], prefixes)
@@ -172,8 +172,7 @@ class SubnetPoolsTest(SubnetPoolsTestBase):
         pool_id = created_subnetpool['id']
         old_prefixes = self._subnetpool_data['prefixes']
         subnetpool_data = {'prefixes': [self.larger_prefix]}
-        self.client.update_subnetpool(pool_id, **subnetpool_data)
-        body = self.client.show_subnetpool(pool_id)
+        body = self.client.update_subnetpool(pool_id, **subnetpool_data)
         prefixes = body['subnetpool']['prefixes']
         self.assertIn(self.larger_prefix, prefixes)
         self.assertNotIn(old_prefixes[0], prefixes)
@@ -194,10 +193,10 @@ class SubnetPoolsTest(SubnetPoolsTestBase):
         if pool_values is None:
             pool_values = {}
 
-        created_subnetpool = self._create_subnetpool(**pool_values)
+        pool_name, subnet_name = _rand_names(2)
+        created_subnetpool = self._create_subnetpool(
+            **dict({'name': pool_name}, **pool_values))
         pool_id = created_subnetpool['id']
-        subnet_name = data_utils.rand_name(SUBNETPOOL_NAME)
-        network = self.create_network()
         subnet_kwargs = {'name': subnet_name,
                          'subnetpool_id': pool_id}
         if subnet_values:
@@ -206,10 +205,12 @@ class SubnetPoolsTest(SubnetPoolsTestBase):
         # that function needs to be enhanced to support subnet_create when
         # prefixlen and subnetpool_id is specified.
         body = self.client.create_subnet(
-            network_id=network['id'],
+            network_id=self.network['id'],
             ip_version=self._ip_version,
             **subnet_kwargs)
         subnet = body['subnet']
+        self.addCleanup(self._try_delete_resource,
+                        self.client.delete_subnet, subnet['id'])
         return pool_id, subnet
 
     @test.attr(type='smoke')
@@ -218,9 +219,9 @@ class SubnetPoolsTest(SubnetPoolsTestBase):
         subnet_values = {"prefixlen": self.max_prefixlen}
         pool_id, subnet = self._create_subnet_from_pool(
             subnet_values=subnet_values)
-        cidr = str(subnet['cidr'])
         self.assertEqual(pool_id, subnet['subnetpool_id'])
-        self.assertTrue(cidr.endswith(str(self.max_prefixlen)))
+        self.assertEqual(int(self.max_prefixlen),
+                         netaddr.IPNetwork(subnet['cidr']).prefixlen)
 
     @test.attr(type='smoke')
     @test.idempotent_id('86b86189-9789-4582-9c3b-7e2bfe5735ee')
@@ -238,10 +239,10 @@ class SubnetPoolsTest(SubnetPoolsTestBase):
         # If neither cidr nor prefixlen is specified,
         # subnet will use subnetpool default_prefixlen for cidr.
         pool_id, subnet = self._create_subnet_from_pool()
-        cidr = str(subnet['cidr'])
         self.assertEqual(pool_id, subnet['subnetpool_id'])
         prefixlen = self._subnetpool_data['min_prefixlen']
-        self.assertTrue(cidr.endswith(str(prefixlen)))
+        self.assertEqual(int(prefixlen),
+                         netaddr.IPNetwork(subnet['cidr']).prefixlen)
 
     @test.attr(type='smoke')
     @test.idempotent_id('a64af292-ec52-4bde-b654-a6984acaf477')
@@ -250,108 +251,117 @@ class SubnetPoolsTest(SubnetPoolsTestBase):
         subnet_values = {"prefixlen": self.max_prefixlen}
         pool_id, subnet = self._create_subnet_from_pool(
             subnet_values=subnet_values, pool_values=pool_values)
-        cidr = str(subnet['cidr'])
         self.assertEqual(pool_id, subnet['subnetpool_id'])
-        self.assertTrue(cidr.endswith(str(self.max_prefixlen)))
+        self.assertEqual(int(self.max_prefixlen),
+                         netaddr.IPNetwork(subnet['cidr']).prefixlen)
+
+
+class SubnetPoolsTestV6(SubnetPoolsTest):
+
+    min_prefixlen = '48'
+    max_prefixlen = '64'
+    _ip_version = 6
+    subnet_cidr = '2001:db8:3::/64'
+    new_prefix = u'2001:db8:5::/64'
+    larger_prefix = u'2001:db8::/32'
 
     @test.attr(type='smoke')
-    @test.idempotent_id('49b44c64-1619-4b29-b527-ffc3c3115dc4')
+    @test.idempotent_id('f62d73dc-cf6f-4879-b94b-dab53982bf3b')
+    def test_create_dual_stack_subnets_from_subnetpools(self):
+        pool_id_v6, subnet_v6 = self._create_subnet_from_pool()
+        pool_values_v4 = {'prefixes': ['192.168.0.0/16'],
+                          'min_prefixlen': 21,
+                          'max_prefixlen': 32}
+        create_v4_subnetpool = self._create_subnetpool(**pool_values_v4)
+        pool_id_v4 = create_v4_subnetpool['id']
+        subnet_v4 = self.client.create_subnet(
+            network_id=subnet_v6['network_id'], ip_version=4,
+            subnetpool_id=pool_id_v4)['subnet']
+        self.addCleanup(self._try_delete_resource,
+                        self.client.delete_subnet, subnet_v4['id'])
+        self.assertEqual(subnet_v4['network_id'], subnet_v6['network_id'])
+
+
+class SubnetPoolsAddressScopeTest(SubnetPoolsTestBase):
+
+    """
+    Tests associating subnetpools with address scopes.
+
+    These tests live in their own class so that the test runner, which
+    schedules tests to workers class by class, can run them concurrently
+    with the rest of the subnetpool tests.
+
+    """
+
+    @classmethod
     @test.requires_ext(extension='address-scope', service='network')
+    def resource_setup(cls):
+        super(SubnetPoolsAddressScopeTest, cls).resource_setup()
+        cls.address_scope, cls.another_address_scope = (
+            cls.create_address_scopes(
+                _rand_names(2, prefix='smoke-address-scope'),
+                ip_version=cls._ip_version))
+
+    def _create_scoped_subnetpool(self, is_admin=False, **kwargs):
+        # All test pools share the same prefixes, and pools in one address
+        # scope must not overlap, so a pool must not outlive its test.
+        subnetpool = self._create_subnetpool(is_admin=is_admin, **kwargs)
+        self.addCleanup(self._delete_subnetpool, subnetpool, is_admin)
+        return subnetpool
+
+    def _delete_subnetpool(self, subnetpool, is_admin=False):
+        if is_admin:
+            client, subnetpools = self.admin_client, self.admin_subnetpools
+        else:
+            client, subnetpools = self.client, self.subnetpools
+        self._try_delete_resource(client.delete_subnetpool, subnetpool['id'])
+        subnetpools.remove(subnetpool)
+
+    @test.attr(type='smoke')
+    @test.idempotent_id('49b44c64-1619-4b29-b527-ffc3c3115dc4')
     def test_create_subnetpool_associate_address_scope(self):
-        address_scope = self.create_address_scope(
-            name=data_utils.rand_name('smoke-address-scope'),
-            ip_version=self._ip_version)
-        created_subnetpool = self._create_subnetpool(
-            address_scope_id=address_scope['id'])
-        body = self.client.show_subnetpool(created_subnetpool['id'])
-        self.assertEqual(address_scope['id'],
-                         body['subnetpool']['address_scope_id'])
+        created_subnetpool = self._create_scoped_subnetpool(
+            address_scope_id=self.address_scope['id'])
+        self.assertEqual(self.address_scope['id'],
+                         created_subnetpool['address_scope_id'])
 
     @test.attr(type='smoke')
     @test.idempotent_id('910b6393-db24-4f6f-87dc-b36892ad6c8c')
-    @test.requires_ext(extension='address-scope', service='network')
     def test_update_subnetpool_associate_address_scope(self):
-        address_scope = self.create_address_scope(
-            name=data_utils.rand_name('smoke-address-scope'),
-            ip_version=self._ip_version)
-        created_subnetpool = self._create_subnetpool()
+        created_subnetpool = self._create_scoped_subnetpool()
         pool_id = created_subnetpool['id']
-        body = self.client.show_subnetpool(pool_id)
-        self.assertIsNone(body['subnetpool']['address_scope_id'])
-        self.client.update_subnetpool(pool_id,
-                                      address_scope_id=address_scope['id'])
-        body = self.client.show_subnetpool(pool_id)
-        self.assertEqual(address_scope['id'],
+        self.assertIsNone(created_subnetpool['address_scope_id'])
+        body = self.client.update_subnetpool(
+            pool_id, address_scope_id=self.address_scope['id'])
+        self.assertEqual(self.address_scope['id'],
                          body['subnetpool']['address_scope_id'])
 
     @test.attr(type='smoke')
     @test.idempotent_id('18302e80-46a3-4563-82ac-ccd1dd57f652')
-    @test.requires_ext(extension='address-scope', service='network')
     def test_update_subnetpool_associate_another_address_scope(self):
-        address_scope = self.create_address_scope(
-            name=data_utils.rand_name('smoke-address-scope'),
-            ip_version=self._ip_version)
-        another_address_scope = self.create_address_scope(
-            name=data_utils.rand_name('smoke-address-scope'),
-            ip_version=self._ip_version)
-        created_subnetpool = self._create_subnetpool(
-            address_scope_id=address_scope['id'])
+        created_subnetpool = self._create_scoped_subnetpool(
+            address_scope_id=self.address_scope['id'])
         pool_id = created_subnetpool['id']
-        body = self.client.show_subnetpool(pool_id)
-        self.assertEqual(address_scope['id'],
-                         body['subnetpool']['address_scope_id'])
-        self.client.update_subnetpool(
-            pool_id, address_scope_id=another_address_scope['id'])
-        body = self.client.show_subnetpool(pool_id)
-        self.assertEqual(another_address_scope['id'],
+        self.assertEqual(self.address_scope['id'],
+                         created_subnetpool['address_scope_id'])
+        body = self.client.update_subnetpool(
+            pool_id, address_scope_id=self.another_address_scope['id'])
+        self.assertEqual(self.another_address_scope['id'],
                          body['subnetpool']['address_scope_id'])
 
     @test.attr(type='smoke')
     @test.idempotent_id('f8970048-e41b-42d6-934b-a1297b07706a')
-    @test.requires_ext(extension='address-scope', service='network')
     def test_update_subnetpool_disassociate_address_scope(self):
-        address_scope = self.create_address_scope(
-            name=data_utils.rand_name('smoke-address-scope'),
-            ip_version=self._ip_version)
-        created_subnetpool = self._create_subnetpool(
-            address_scope_id=address_scope['id'])
+        created_subnetpool = self._create_scoped_subnetpool(
+            address_scope_id=self.address_scope['id'])
         pool_id = created_subnetpool['id']
-        body = self.client.show_subnetpool(pool_id)
-        self.assertEqual(address_scope['id'],
-                         body['subnetpool']['address_scope_id'])
-        self.client.update_subnetpool(pool_id,
-                                      address_scope_id=None)
-        body = self.client.show_subnetpool(pool_id)
+        self.assertEqual(self.address_scope['id'],
+                         created_subnetpool['address_scope_id'])
+        body = self.client.update_subnetpool(pool_id,
+                                             address_scope_id=None)
         self.assertIsNone(body['subnetpool']['address_scope_id'])
 
 
-class SubnetPoolsTestV6(SubnetPoolsTest):
+class SubnetPoolsAddressScopeTestV6(SubnetPoolsAddressScopeTest):
 
-    min_prefixlen = '48'
-    max_prefixlen = '64'
     _ip_version = 6
-    subnet_cidr = '2001:db8:3::/64'
-    new_prefix = u'2001:db8:5::/64'
-    larger_prefix = u'2001:db8::/32'
-
-    @classmethod
-    def resource_setup(cls):
-        super(SubnetPoolsTestV6, cls).resource_setup()
-        min_prefixlen = '64'
-        prefixes = [u'2001:db8:3::/48']
-        cls._subnetpool_data = {'min_prefixlen': min_prefixlen,
-                                'prefixes': prefixes}
-
-    @test.attr(type='smoke')
-    @test.idempotent_id('f62d73dc-cf6f-4879-b94b-dab53982bf3b')
-    def test_create_dual_stack_subnets_from_subnetpools(self):
-        pool_id_v6, subnet_v6 = self._create_subnet_from_pool()
-        pool_values_v4 = {'prefixes': ['192.168.0.0/16'],
-                          'min_prefixlen': 21,
-                          'max_prefixlen': 32}
-        create_v4_subnetpool = self._create_subnetpool(**pool_values_v4)
-        pool_id_v4 = create_v4_subnetpool['id']
-        subnet_v4 = self.client.create_subnet(
-            network_id=subnet_v6['network_id'], ip_version=4,
-            subnetpool_id=pool_id_v4)['subnet']
-        self.assertEqual(subnet_v4['network_id'], subnet_v6['network_id'])
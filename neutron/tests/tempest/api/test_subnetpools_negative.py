@@ -238,9 +238,8 @@ class SubnetPoolsNegativeTestJSON(test_subnetpools.SubnetPoolsTestBase):
         created_subnetpool = self._create_subnetpool(**pool_values)
         pool_id = created_subnetpool['id']
         # associate the subnetpool to the address scope as an admin
-        self.admin_client.update_subnetpool(pool_id,
-                                            address_scope_id=addr_scope_id)
-        body = self.admin_client.show_subnetpool(pool_id)
+        body = self.admin_client.update_subnetpool(
+            pool_id, address_scope_id=addr_scope_id)
         self.assertEqual(addr_scope_id,
                          body['subnetpool']['address_scope_id'])
 
@@ -251,8 +250,8 @@ class SubnetPoolsNegativeTestJSON(test_subnetpools.SubnetPoolsTestBase):
                           pool_id, prefixes=update_prefixes)
 
         # admin can update the prefixes
-        self.admin_client.update_subnetpool(pool_id, prefixes=update_prefixes)
-        body = self.admin_client.show_subnetpool(pool_id)
+        body = self.admin_client.update_subnetpool(pool_id,
+                                                   prefixes=update_prefixes)
         self.assertEqual(update_prefixes,
                          body['subnetpool']['prefixes'])
 
@@ -21,13 +21,14 @@ from tempest.test_discover import plugins
 
 import neutron
 
+_BASE_PATH = os.path.dirname(os.path.dirname(
+    os.path.abspath(neutron.__file__)))
+_FULL_TEST_DIR = os.path.join(_BASE_PATH, "neutron/tests/tempest")
+
+
 class NeutronTempestPlugin(plugins.TempestPlugin):
     def load_tests(self):
-        base_path =  os.path.split(os.path.dirname(
-            os.path.abspath(neutron.__file__)))[0]
-        test_dir = "neutron/tests/tempest"
-        full_test_dir = os.path.join(base_path, test_dir)
-        return full_test_dir, base_path
+        return _FULL_TEST_DIR, _BASE_PATH
 
     def register_opts(self, conf):
         pass
@@ -192,7 +192,7 @@ class NetworkClientJSON(service_client.RestClient):
     def list_subnetpools(self, **filters):
         uri = self.get_uri("subnetpools")
         if filters:
-            uri = '?'.join([uri, urlparse.urlencode(filters)])
+            uri = '?'.join([uri, urlparse.urlencode(filters, doseq=1)])
         resp, body = self.get(uri)
         body = {'subnetpools': self.deserialize_list(body)}
         self.expected_success(200, resp.status)
@@ -360,6 +360,16 @@ class NetworkClientJSON(service_client.RestClient):
         self.expected_success(201, resp.status)
         return service_client.ResponseBody(resp, body)
 
+    def create_bulk_address_scope(self, address_scope_list):
+        post_data = {'address_scopes': address_scope_list}
+        body = self.serialize_list(post_data, 'address_scopes',
+                                   'address_scope')
+        uri = self.get_uri('address_scopes')
+        resp, body = self.post(uri, body)
+        body = {'address_scopes': self.deserialize_list(body)}
+        self.expected_success(201, resp.status)
+        return service_client.ResponseBody(resp, body)
+
     def wait_for_resource_deletion(self, resource_type, id):
         """Waits for a resource to be deleted."""
         start_time = int(time.time())
@@ -213,6 +213,8 @@ fake_down_network = dhcp.NetModel(
 
 
 class TestDhcpAgent(base.BaseTestCase):
+    _needs_process_monitor = True
+
     def setUp(self):
         super(TestDhcpAgent, self).setUp()
         entry.register_options(cfg.CONF)
@@ -568,6 +570,8 @@ class TestLogArgs(base.BaseTestCase):
 
 
 class TestDhcpAgentEventHandler(base.BaseTestCase):
+    _needs_process_monitor = True
+
     def setUp(self):
         super(TestDhcpAgentEventHandler, self).setUp()
         config.register_interface_driver_opts_helper(cfg.CONF)
@@ -62,6 +62,8 @@ FIP_PRI = 32768
 
 
 class BasicRouterOperationsFramework(base.BaseTestCase):
+    _needs_process_monitor = True
+
     def setUp(self):
         super(BasicRouterOperationsFramework, self).setUp()
         mock.patch('eventlet.spawn').start()
@@ -41,6 +41,8 @@ HOSTNAME = 'myhost'
 
 class TestDvrRouterOperations(base.BaseTestCase):
 
+    _needs_process_monitor = True
+
     def setUp(self):
         super(TestDvrRouterOperations, self).setUp()
         mock.patch('eventlet.spawn').start()
@@ -28,6 +28,8 @@ _uuid = uuidutils.generate_uuid
 
 class NamespaceManagerTestCaseFramework(base.BaseTestCase):
 
+    _needs_process_monitor = True
+
     def _create_namespace_manager(self):
         self.agent_conf = mock.Mock()
         self.driver = mock.Mock()
@@ -28,6 +28,8 @@ TEST_PID = 1234
 
 class BaseTestProcessMonitor(base.BaseTestCase):
 
+    _needs_process_monitor = True
+
     def setUp(self):
         super(BaseTestProcessMonitor, self).setUp()
         self.log_patch = mock.patch("neutron.agent.linux.external_process."
@@ -59,6 +59,8 @@ class TestMetadataDriverRules(base.BaseTestCase):
 
 class TestMetadataDriverProcess(base.BaseTestCase):
 
+    _needs_process_monitor = True
+
     EUID = 123
     EGID = 456
     EUNAME = 'neutron'
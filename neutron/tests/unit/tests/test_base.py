@@ -18,6 +18,7 @@
 import sys
 import unittest2
 
+from neutron import policy
 from neutron.tests import base
 
 
@@ -70,3 +71,78 @@ class SystemExitTestCase(base.DietTestCase):
         self.assertEqual([], result.errors)
         self.assertItemsEqual(set(id(t) for t in expectedFails),
                               set(id(t) for (t, traceback) in result.failures))
+
+
+class PolicyResetTestCase(base.DietTestCase):
+    # Embedded to hide from the regular test discovery
+    class MyTestCase(base.BaseTestCase):
+        def __init__(self, action=None):
+            super(PolicyResetTestCase.MyTestCase, self).__init__()
+            self.action = action
+
+        def runTest(self):
+            if self.action is not None:
+                self.action()
+            self.enforcer = policy._ENFORCER
+
+    def setUp(self):
+        super(PolicyResetTestCase, self).setUp()
+        self.addCleanup(policy.reset)
+
+    def _run_test(self, action=None):
+        test = self.MyTestCase(action)
+        result = test.run()
+        self.assertTrue(result.wasSuccessful())
+        return test
+
+    def test_untouched_policy_is_kept(self):
+        test = self._run_test()
+        self.assertIsNotNone(test.enforcer)
+        self.assertIs(test.enforcer, policy._ENFORCER)
+
+    def test_policy_rules_updated_in_place_are_reset(self):
+        test = self._run_test(
+            lambda: policy.set_rules({'test_rule': '!'}, overwrite=False))
+        self.assertIsNotNone(test.enforcer)
+        self.assertIsNone(policy._ENFORCER)
+
+    def test_refreshed_policy_is_reset(self):
+        test = self._run_test(policy.refresh)
+        self.assertIsNotNone(test.enforcer)
+        self.assertIsNone(policy._ENFORCER)
+
+
+class SortDictListsTestCase(base.DietTestCase):
+
+    def test_sort_dict_lists_nested(self):
+        dic = {'a': [3, 1, 2], 'b': {'c': ['z', 'x'], 'd': {'e': [2, 1]}},
+               'f': 'g'}
+        expected = {'a': [1, 2, 3], 'b': {'c': ['x', 'z'], 'd': {'e': [1, 2]}},
+                    'f': 'g'}
+        self.assertEqual(expected, self.sort_dict_lists(dic))
+
+
+class SanitizeLogPathTestCase(base.DietTestCase):
+
+    def test_sanitize_log_path(self):
+        self.assertEqual(
+            '/tmp/test_foo_bar_-baz_.log',
+            base.sanitize_log_path('/tmp/test_foo(bar) baz).log'))
+
+    def test_sanitize_log_path_unicode(self):
+        self.assertEqual(
+            u'/tmp/test_foo_bar_-baz_.log',
+            base.sanitize_log_path(u'/tmp/test_foo(bar) baz).log'))
+
+
+class GetRandNameTestCase(base.DietTestCase):
+
+    def test_get_rand_name_default_length(self):
+        name = base.get_rand_name(prefix='pre')
+        self.assertTrue(name.startswith('pre'))
+        self.assertEqual(len('pre') + 8, len(name))
+
+    def test_get_rand_name_max_length(self):
+        name = base.get_rand_name(max_length=10, prefix='pre')
+        self.assertTrue(name.startswith('pre'))
+        self.assertEqual(10, len(name))